@@ -6,20 +6,21 @@ directories based on file types, with support for conflict resolution,
 logging, and dry-run mode.
 """
 
+import os
+import copy
 import sys
+import errno
 import shutil
 import logging
+import logging.handlers
 import argparse
+import functools
+import threading
+import unicodedata
 from pathlib import Path
-from typing import Dict, Optional, DefaultDict, Any, List, Set, Tuple
-from dataclasses import dataclass, field
-from collections import defaultdict
-
-try:
-    import yaml
-except ImportError:
-    print("Error: PyYAML is required. Install it with: pip install pyyaml")
-    sys.exit(1)
+from typing import Dict, Optional, DefaultDict, Any, List, Set, Tuple, FrozenSet
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 
 # Optional progress bar support
 try:
@@ -29,15 +30,158 @@ except ImportError:
     HAS_TQDM = False
 
 
-@dataclass
+def _read_yaml(config_path: str) -> Dict[str, Any]:
+    """Parse a YAML configuration file, importing PyYAML on first use."""
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError(
+            "PyYAML is required for YAML configuration files. "
+            "Install it with: pip install pyyaml"
+        )
+    
+    # Prefer the LibYAML-backed C parser; pure-Python SafeLoader otherwise
+    try:
+        from yaml import CSafeLoader as loader
+    except ImportError:
+        from yaml import SafeLoader as loader
+    
+    with open(config_path, 'r', encoding='utf-8') as f:
+        try:
+            return yaml.load(f, Loader=loader)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Error parsing configuration file: {e}")
+
+
+def _read_toml(config_path: str) -> Dict[str, Any]:
+    """Parse a TOML configuration file with the standard library parser."""
+    try:
+        import tomllib
+    except ImportError:
+        # Python < 3.11: use the tomli backport if it is installed
+        try:
+            import tomli as tomllib
+        except ImportError:
+            raise ImportError(
+                "TOML configuration files require Python 3.11+ or the tomli "
+                "package. Install it with: pip install tomli"
+            )
+    
+    with open(config_path, 'rb') as f:
+        try:
+            return tomllib.load(f)
+        except tomllib.TOMLDecodeError as e:
+            raise ValueError(f"Error parsing configuration file: {e}")
+
+
+def _read_config_file(config_path: str) -> Dict[str, Any]:
+    """Parse a configuration file, choosing TOML or YAML by its extension."""
+    if config_path.lower().endswith('.toml'):
+        return _read_toml(config_path)
+    return _read_yaml(config_path)
+
+
+@functools.lru_cache(maxsize=32)
+def _load_config_cached(config_path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Parse a configuration file once per (path, mtime, size) key.
+    
+    Callers must deep-copy the result before modifying it.
+    """
+    return _read_config_file(config_path)
+
+
+def clear_config_cache() -> None:
+    """Forget all parsed configuration files."""
+    _load_config_cached.cache_clear()
+
+
+def _select_copy_function():
+    """Return the copy function used when a move has to cross filesystems.
+    
+    On Windows before Python 3.12, shutil.copy2 copies with a Python
+    read/write loop; call CopyFileExW instead so the copy runs inside the OS.
+    Newer Pythons already use CopyFile2 in shutil.copy2.
+    """
+    if sys.platform != 'win32':
+        return shutil.copy2
+    
+    import _winapi
+    if hasattr(_winapi, 'CopyFile2'):
+        return shutil.copy2
+    
+    import ctypes
+    from ctypes import wintypes
+    
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    copy_file_ex = kernel32.CopyFileExW
+    copy_file_ex.argtypes = [wintypes.LPCWSTR, wintypes.LPCWSTR, ctypes.c_void_p,
+                             ctypes.c_void_p, ctypes.c_void_p, wintypes.DWORD]
+    copy_file_ex.restype = wintypes.BOOL
+    
+    def copy_file(src, dst):
+        if not copy_file_ex(os.fsdecode(src), os.fsdecode(dst), None, None, None, 0):
+            raise ctypes.WinError(ctypes.get_last_error())
+        return dst
+    
+    return copy_file
+
+
+_COPY_FUNCTION = _select_copy_function()
+
+
+def _name_key(name: str) -> str:
+    """Return the key used to compare destination names for conflicts.
+    
+    Conservative on purpose: case-insensitive filesystems (Windows, macOS,
+    FAT/exFAT/NTFS mounts) and macOS Unicode normalization can make two
+    different spellings the same file, so candidates that only match on this
+    key are confirmed with exists().
+    """
+    return unicodedata.normalize('NFC', name).casefold()
+
+
+def _get_extension(name: str) -> str:
+    """Return the lowercased extension of a file name, matching Path.suffix."""
+    i = name.rfind('.')
+    if 0 < i < len(name) - 1:
+        return name[i:].lower()
+    return ''
+
+
 class OrganizationStats:
     """Track statistics for file organization operations."""
-    files_moved: int = 0
-    folders_moved: int = 0
-    errors: int = 0
-    skipped: int = 0
-    conflicts_resolved: int = 0
-    categories: DefaultDict[str, int] = field(default_factory=lambda: defaultdict(int))
+    __slots__ = ('files_moved', 'folders_moved', 'errors', 'skipped',
+                 'conflicts_resolved', 'categories')
+    
+    def __init__(self, files_moved: int = 0, folders_moved: int = 0, errors: int = 0,
+                 skipped: int = 0, conflicts_resolved: int = 0,
+                 categories: Optional[DefaultDict[str, int]] = None) -> None:
+        self.files_moved = files_moved
+        self.folders_moved = folders_moved
+        self.errors = errors
+        self.skipped = skipped
+        self.conflicts_resolved = conflicts_resolved
+        self.categories: DefaultDict[str, int] = (
+            defaultdict(int) if categories is None else categories)
+    
+    def _fields(self) -> Tuple[Any, ...]:
+        """Return the field values in declaration order."""
+        return tuple(getattr(self, name) for name in self.__slots__)
+    
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._fields() == other._fields()
+    
+    # Mutable, so unhashable like the dataclass it replaced
+    __hash__ = None
+    
+    def __repr__(self) -> str:
+        return (f"OrganizationStats(files_moved={self.files_moved}, "
+                f"folders_moved={self.folders_moved}, errors={self.errors}, "
+                f"skipped={self.skipped}, "
+                f"conflicts_resolved={self.conflicts_resolved}, "
+                f"categories={dict(self.categories)})")
 
 
 class DownloadOrganizer:
@@ -51,26 +195,45 @@ class DownloadOrganizer:
         # Cache frequently accessed config sections
         self._settings = self.config.get('settings', {})
         self._folder_config = self.config.get('folders', {})
+        # Threads mostly wait on I/O, so allow a few per CPU (capped at 8)
+        self._workers = self._settings.get('workers', min(8, (os.cpu_count() or 1) * 2))
         
         self.stats = OrganizationStats()
+        self._stats_lock = threading.Lock()
+        self._dest_names: Dict[Path, Dict[str, Optional[str]]] = {}
+        self._next_counters: Dict[Tuple[Path, str], int] = {}
+        self._created_dirs: Set[Path] = set()
         self._compressed_exts = self._build_compressed_extensions()
+        self._deep_scan = self._folder_config.get('deep_scan', False)
+        
+        # Resolve destination paths once instead of per file
+        self._base_dest = self._expand_path(self.config['base_destination'])
+        self._other_dest = self._base_dest / self.config.get('other_destination', 'Other')
+        self._compressed_dest = self._base_dest / self._folder_config.get(
+            'compressed_destination', 'Compressed Folders')
+        self._regular_dest = self._base_dest / self._folder_config.get(
+            'regular_destination', 'Folders')
+        # Interned so stats.categories lookups with literal names compare by identity
+        self._category_names = [sys.intern(str(name)) for name in self.config.get('file_types', {})]
+        self._category_names.append('other')
+        self._other_id = len(self._category_names) - 1
         self._ext_map = self._build_extension_map()
         self._has_tqdm = HAS_TQDM and self._settings.get('show_progress', True)
         self.logger = self._setup_logging()
         
     def _load_config(self, config_path: str) -> Dict[str, Any]:
-        """Load configuration from YAML file."""
+        """Load configuration from a YAML or TOML file."""
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
-            return self._normalize_extensions(config)
+            # Key the parse cache on the file's stat so edits are picked up
+            abs_path = os.path.abspath(config_path)
+            stat = os.stat(abs_path)
+            config = _load_config_cached(abs_path, stat.st_mtime_ns, stat.st_size)
+            return self._normalize_extensions(copy.deepcopy(config))
         except FileNotFoundError:
             raise FileNotFoundError(
                 f"Configuration file not found: {config_path}\n"
                 "Please create a config.yaml file or specify a valid path."
             )
-        except yaml.YAMLError as e:
-            raise ValueError(f"Error parsing configuration file: {e}")
     
     def _normalize_extensions(self, config: dict) -> dict:
         """Normalize all file extensions to lowercase."""
@@ -89,21 +252,29 @@ class DownloadOrganizer:
                 "Please check your config.yaml file."
             )
     
-    def _build_compressed_extensions(self) -> set:
-        """Build and cache compressed file extensions."""
-        compressed_exts = set()
-        for info in self.config.get('file_types', {}).values():
-            if 'compressed' in str(info.get('destination', '')).lower():
-                compressed_exts.update(info.get('extensions', []))
-        return compressed_exts
+    def _build_compressed_extensions(self) -> FrozenSet[str]:
+        """Build and cache compressed file extensions.
+        
+        Extensions are already lowercased by _normalize_extensions, so the
+        result can be used directly for membership checks.
+        """
+        return frozenset(
+            ext
+            for info in self.config.get('file_types', {}).values()
+            if 'compressed' in str(info.get('destination', '')).lower()
+            for ext in info.get('extensions', [])
+        )
     
-    def _build_extension_map(self) -> Dict[str, tuple]:
-        """Build reverse lookup map: extension -> (category, destination)."""
+    def _build_extension_map(self) -> Dict[str, Tuple[int, Path]]:
+        """Build reverse lookup map: extension -> (category id, destination folder).
+        
+        Category ids index into self._category_names.
+        """
         ext_map = {}
-        for category, info in self.config.get('file_types', {}).items():
-            destination = info.get('destination', category)
+        for category_id, (category, info) in enumerate(self.config.get('file_types', {}).items()):
+            dest_folder = self._base_dest / info.get('destination', category)
             for ext in info.get('extensions', []):
-                ext_map[ext.lower()] = (category, destination)
+                ext_map[ext.lower()] = (category_id, dest_folder)
         return ext_map
     
     def _setup_logging(self) -> logging.Logger:
@@ -123,7 +294,13 @@ class DownloadOrganizer:
         logger = logging.getLogger(__name__)
         logger.setLevel(level)
         
-        # Clear any existing handlers to avoid duplicates
+        # Close and clear any existing handlers to avoid duplicates
+        # (closing flushes records still buffered by a previous instance)
+        for handler in logger.handlers:
+            target = getattr(handler, 'target', None)
+            handler.close()
+            if target is not None:
+                target.close()
         logger.handlers.clear()
         
         formatter = logging.Formatter(
@@ -138,61 +315,130 @@ class DownloadOrganizer:
         
         if log_config.get('log_to_file', True):
             log_file = log_config.get('log_file', 'download_organizer.log')
-            file_handler = logging.FileHandler(log_file)
+            file_handler = logging.FileHandler(log_file, delay=True)
             file_handler.setFormatter(formatter)
-            logger.addHandler(file_handler)
+            # Buffer file writes; flushed on errors, at the end of a run and at exit
+            buffered_handler = logging.handlers.MemoryHandler(
+                capacity=1024, flushLevel=logging.ERROR, target=file_handler
+            )
+            logger.addHandler(buffered_handler)
         
         return logger
     
-    def _get_progress_iterator(self, iterable, desc: str = "Processing"):
+    def _get_progress_iterator(self, iterable, desc: str = "Processing",
+                               total: Optional[int] = None):
         """Wrap an iterable with a progress bar if tqdm is available."""
         if self._has_tqdm:
-            return tqdm(iterable, desc=desc, unit="items")
+            return tqdm(iterable, desc=desc, unit="items", total=total)
         return iterable
     
     def _expand_path(self, path_str: str) -> Path:
         """Expand user home directory and convert to absolute Path."""
         return Path(path_str).expanduser().resolve()
     
+    def _lookup_destination(self, name: str) -> Tuple[int, Path]:
+        """Return (category id, destination folder) for a file name without counting it."""
+        # O(1) lookup returning a pre-joined destination path; unmatched
+        # extensions fall through to the 'other' category
+        return self._ext_map.get(_get_extension(name), (self._other_id, self._other_dest))
+    
     def _get_destination_for_file(self, file_path: Path) -> Optional[Path]:
         """Determine the destination folder for a given file."""
-        extension = file_path.suffix.lower()
-        base_dest = self._expand_path(self.config['base_destination'])
+        category_id, dest_folder = self._lookup_destination(file_path.name)
+        self.stats.categories[self._category_names[category_id]] += 1
+        return dest_folder
+    
+    def _record_categories(self, category_counts: List[int]) -> None:
+        """Add per-category counts (indexed by category id) to the stats."""
+        for category, count in zip(self._category_names, category_counts):
+            if count:
+                self.stats.categories[category] += count
+    
+    def _scan_destination_names(self, folder: Path) -> Dict[str, Optional[str]]:
+        """Map the name keys of a folder's entries to their exact names.
         
-        # O(1) lookup instead of O(n) loop
-        if extension in self._ext_map:
-            category, dest_folder = self._ext_map[extension]
-            self.stats.categories[category] += 1
-            return base_dest / dest_folder
+        Returns an empty map if the folder doesn't exist.
+        """
+        try:
+            with os.scandir(folder) as it:
+                return {_name_key(entry.name): entry.name for entry in it}
+        except FileNotFoundError:
+            return {}
+    
+    @staticmethod
+    def _name_taken(names: Dict[str, Optional[str]], path: Path) -> bool:
+        """Check a candidate destination against a folder's name map.
         
-        # No matching category found
-        other_dest = self.config.get('other_destination', 'Other')
-        self.stats.categories['other'] += 1
-        return base_dest / other_dest
+        Names reserved earlier in the batch (mapped to None) are not on disk
+        yet, so any key match with them counts as a conflict. A key match
+        with a different on-disk spelling is confirmed with exists().
+        """
+        key = _name_key(path.name)
+        if key not in names:
+            return False
+        existing = names[key]
+        if existing is None or existing == path.name:
+            return True
+        return path.exists()
+    
+    def _prime_destination_cache(self, folders: Set[Path]) -> None:
+        """Scan each destination folder once so conflict checks stay in memory."""
+        for folder in folders:
+            if folder in self._dest_names:
+                continue
+            try:
+                self._dest_names[folder] = self._scan_destination_names(folder)
+            except OSError as e:
+                # Leave it uncached; _resolve_conflict falls back to exists()
+                self.logger.warning("Could not scan %s: %s", folder, e)
     
     def _resolve_conflict(self, dest_path: Path) -> Path:
         """Resolve file name conflicts by appending a counter.
         
+        During batch operations the destination folder listing is cached in
+        memory, and every resolved name is reserved so later items in the same
+        run see it. The next free counter per name is remembered as well, so
+        repeated conflicts on the same name don't re-probe 1, 2, 3, ... each
+        time. Outside a batch a single exists() check is used, falling back
+        to one directory scan when there is a conflict.
+        
         Note: There is an inherent race condition between checking file existence
         and moving the file. In concurrent environments, another process could
         create a file with the same name between the check and the move operation.
         The move operation in _move_file handles this with try/except.
         """
-        if not dest_path.exists():
+        parent = dest_path.parent
+        names = self._dest_names.get(parent)
+        cached = names is not None
+        if not cached:
+            if not dest_path.exists():
+                return dest_path
+            names = self._scan_destination_names(parent)
+        
+        key = _name_key(dest_path.name)
+        if not self._name_taken(names, dest_path):
+            names[key] = None
             return dest_path
         
         self.stats.conflicts_resolved += 1
         stem = dest_path.stem
         suffix = dest_path.suffix
-        parent = dest_path.parent
-        counter = 1
+        counter = self._next_counters.get((parent, key), 1) if cached else 1
+        new_name = f"{stem}_{counter}{suffix}"
         
-        while dest_path.exists():
-            new_name = f"{stem}_{counter}{suffix}"
-            dest_path = parent / new_name
+        while self._name_taken(names, parent / new_name):
             counter += 1
+            new_name = f"{stem}_{counter}{suffix}"
         
-        return dest_path
+        names[_name_key(new_name)] = None
+        if cached:
+            self._next_counters[(parent, key)] = counter + 1
+        return parent / new_name
+    
+    def _clear_destination_cache(self) -> None:
+        """Forget cached destination listings at the end of a batch."""
+        self._dest_names.clear()
+        self._next_counters.clear()
     
     def _should_skip_file(self, file_path: Path) -> bool:
         """Check if file should be skipped based on settings."""
@@ -202,67 +448,128 @@ class DownloadOrganizer:
         
         return False
     
+    def _plan_destination(self, source: Path, destination_folder: Path) -> Path:
+        """Return the final destination path for an item, resolving conflicts."""
+        dest_path = destination_folder / source.name
+        
+        # Handle conflicts if enabled
+        if self._settings.get('handle_conflicts', True):
+            dest_path = self._resolve_conflict(dest_path)
+        return dest_path
+    
     def _move_item(self, source: Path, destination_folder: Path, 
-                   dry_run: bool = False, is_folder: bool = False) -> bool:
-        """Move a file or folder to the destination."""
+                   dry_run: bool = False, is_folder: bool = False,
+                   dest_path: Optional[Path] = None) -> bool:
+        """Move a file or folder to the destination.
+        
+        If dest_path is given, it was already planned by the caller (batch
+        mode) and directory creation and conflict resolution are skipped.
+        """
         item_type = "folder" if is_folder else "file"
+        name = source.name
+        planned = dest_path is not None
         
         try:
-            # Create destination directory if needed
-            if self._settings.get('create_directories', True):
-                if not dry_run:
-                    destination_folder.mkdir(parents=True, exist_ok=True)
-            
-            dest_path = destination_folder / source.name
-            
-            # Handle conflicts if enabled
-            if self._settings.get('handle_conflicts', True):
-                dest_path = self._resolve_conflict(dest_path)
+            if not planned:
+                # Create destination directory if needed
+                if self._settings.get('create_directories', True):
+                    if not dry_run:
+                        self._ensure_directory(destination_folder)
+                
+                dest_path = self._plan_destination(source, destination_folder)
             
             if dry_run:
-                self.logger.info(f"[DRY RUN] Would move {item_type}: {source.name} -> {dest_path}")
+                self.logger.info("[DRY RUN] Would move %s: %s -> %s", item_type, name, dest_path)
             else:
-                self.logger.info(f"Moving {item_type}: {source.name} -> {dest_path}")
-                shutil.move(str(source), str(dest_path))
-                self.logger.info(f"Moved {item_type}: {source.name}")
+                self.logger.debug("Moving %s: %s -> %s", item_type, name, dest_path)
+                try:
+                    self._transfer(source, dest_path)
+                except FileNotFoundError:
+                    # The remembered destination folder may have been deleted
+                    # since it was created (e.g. while the watcher runs)
+                    if (planned or destination_folder.is_dir()
+                            or not self._settings.get('create_directories', True)):
+                        raise
+                    self._created_dirs.discard(destination_folder)
+                    self._ensure_directory(destination_folder)
+                    self._transfer(source, dest_path)
+                self.logger.info("Moved %s: %s", item_type, name)
             
-            if is_folder:
-                self.stats.folders_moved += 1
-            else:
-                self.stats.files_moved += 1
+            with self._stats_lock:
+                if is_folder:
+                    self.stats.folders_moved += 1
+                else:
+                    self.stats.files_moved += 1
             return True
             
         except PermissionError:
-            self.logger.error(f"Permission denied: {source.name}")
-            self.stats.errors += 1
+            self.logger.error("Permission denied: %s", name)
+            self._record_error()
             return False
         except FileExistsError:
             # Race condition: file was created after conflict resolution check
-            self.logger.error(f"File already exists (race condition): {dest_path.name}")
-            self.stats.errors += 1
+            self.logger.error("File already exists (race condition): %s", name)
+            self._record_error()
             return False
         except Exception as e:
-            self.logger.error(f"Error moving {item_type} {source.name}: {e}")
-            self.stats.errors += 1
+            self.logger.error("Error moving %s %s: %s", item_type, name, e)
+            self._record_error()
+            # The folder may have been removed since it was created; retry mkdir next time
+            self._created_dirs.discard(destination_folder)
             return False
     
+    def _transfer(self, source: Path, dest_path: Path) -> None:
+        """Rename source to dest_path, copying only across filesystems.
+        
+        os.rename (not os.replace) is used so an unexpected existing target
+        raises instead of being overwritten on Windows.
+        """
+        try:
+            os.rename(source, dest_path)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            shutil.move(source, dest_path, copy_function=_COPY_FUNCTION)
+    
+    def _record_error(self) -> None:
+        """Increment the error counter (safe to call from worker threads)."""
+        with self._stats_lock:
+            self.stats.errors += 1
+    
     def _move_file(self, source: Path, destination_folder: Path, dry_run: bool = False) -> bool:
         """Move a file to the destination folder."""
         return self._move_item(source, destination_folder, dry_run, is_folder=False)
     
     def _is_compressed_folder(self, folder_path: Path) -> bool:
-        """Check if a folder contains compressed files (shallow check)."""
+        """Check if a folder contains compressed files.
+        
+        Only top-level files are checked unless folders.deep_scan is enabled,
+        in which case subfolders are searched breadth-first. Either way the
+        scan stops at the first compressed file found.
+        """
+        compressed_exts = self._compressed_exts
+        
         # Check if folder name has compressed extension
-        if folder_path.suffix.lower() in self._compressed_exts:
+        if _get_extension(folder_path.name) in compressed_exts:
             return True
         
-        # Check only top-level files (don't recurse)
-        try:
-            for item in folder_path.iterdir():
-                if item.is_file() and item.suffix.lower() in self._compressed_exts:
-                    return True
-        except (PermissionError, OSError) as e:
-            self.logger.warning(f"Could not check {folder_path.name}: {e}")
+        pending = deque([folder_path])
+        while pending:
+            current = pending.popleft()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        if (_get_extension(entry.name) in compressed_exts
+                                and entry.is_file(follow_symlinks=False)):
+                            return True
+                        if self._deep_scan and entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+            except OSError as e:
+                if current is folder_path:
+                    self.logger.warning("Could not check %s: %s", folder_path.name, e)
+                    return False
+                # An unreadable subfolder shouldn't hide archives in its siblings
+                self.logger.warning("Could not check %s: %s", current, e)
         
         return False
     
@@ -270,6 +577,12 @@ class DownloadOrganizer:
         """Move a folder to the destination."""
         return self._move_item(source, destination_folder, dry_run, is_folder=True)
     
+    def _ensure_directory(self, directory: Path) -> None:
+        """Create a directory once per organizer instance."""
+        if directory not in self._created_dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(directory)
+    
     def _batch_create_directories(self, directories: Set[Path], dry_run: bool = False) -> None:
         """Batch create all destination directories at once."""
         if not self._settings.get('create_directories', True):
@@ -277,39 +590,81 @@ class DownloadOrganizer:
         
         for directory in directories:
             if dry_run:
-                self.logger.debug(f"[DRY RUN] Would create directory: {directory}")
+                self.logger.debug("[DRY RUN] Would create directory: %s", directory)
             else:
-                directory.mkdir(parents=True, exist_ok=True)
+                self._ensure_directory(directory)
     
-    def _collect_file_operations(self, source_dir: Path) -> List[Tuple[Path, Path]]:
-        """Collect all file operations to be performed.
+    def _collect_operations(self, source_dir: Path, include_files: bool = True,
+                            include_folders: bool = False
+                            ) -> Tuple[List[Tuple[Path, Path]], List[Tuple[Path, Path]]]:
+        """Collect file and folder operations in a single pass over the source.
         
         Returns:
-            List of (source_file, destination_folder) tuples
+            Tuple of (file_operations, folder_operations), each a list of
+            (source_item, destination_folder) tuples
         """
-        operations = []
-        items = list(source_dir.iterdir())
-        
-        for item in self._get_progress_iterator(items, desc="Scanning files"):
-            if item.is_file():
-                if self._should_skip_file(item):
-                    self.logger.debug(f"Skipping: {item.name}")
+        file_operations = []
+        folders = []
+        # Count categories by id in the loop and fold them into the stats once
+        category_counts = [0] * len(self._category_names)
+        # DirEntry caches the entry type from the directory listing, so the
+        # is_file()/is_dir() checks below cost no extra stat call per entry
+        with os.scandir(source_dir) as it:
+            entries = list(it)
+        
+        # Same rule as _should_skip_file, applied to the entry name so skipped
+        # entries never get a Path object
+        skip_hidden = self._settings.get('skip_hidden_files', True)
+        
+        for entry in self._get_progress_iterator(entries, desc="Scanning downloads"):
+            name = entry.name
+            if include_files and entry.is_file(follow_symlinks=False):
+                if skip_hidden and name.startswith('.'):
+                    self.logger.debug("Skipping: %s", name)
+                    self.stats.skipped += 1
+                    continue
+                
+                category_id, dest_folder = self._lookup_destination(name)
+                category_counts[category_id] += 1
+                file_operations.append((Path(entry.path), dest_folder))
+            
+            elif include_folders and entry.is_dir(follow_symlinks=False):
+                if skip_hidden and name.startswith('.'):
+                    self.logger.debug("Skipping folder: %s", name)
                     self.stats.skipped += 1
                     continue
                 
-                dest_folder = self._get_destination_for_file(item)
-                if dest_folder:
-                    operations.append((item, dest_folder))
+                folders.append(Path(entry.path))
+        
+        self._record_categories(category_counts)
+        return file_operations, self._classify_folders(folders)
+    
+    def _classify_folders(self, folders: List[Path]) -> List[Tuple[Path, Path]]:
+        """Pair each folder with its destination based on its contents.
         
-        return operations
+        Checking folder contents is I/O bound, so folders are probed in
+        parallel using the same worker count as file moves.
+        """
+        workers = self._workers
+        if workers > 1 and len(folders) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                compressed = list(executor.map(self._is_compressed_folder, folders))
+        else:
+            compressed = [self._is_compressed_folder(folder) for folder in folders]
+        
+        return [
+            (folder, self._compressed_dest if is_compressed else self._regular_dest)
+            for folder, is_compressed in zip(folders, compressed)
+        ]
     
     def _execute_batch_operations(self, operations: List[Tuple[Path, Path]], 
-                                   dry_run: bool = False) -> None:
-        """Execute batched file operations.
+                                   dry_run: bool = False, is_folder: bool = False) -> None:
+        """Execute batched file or folder operations.
         
         Args:
-            operations: List of (source_file, destination_folder) tuples
+            operations: List of (source_item, destination_folder) tuples
             dry_run: Whether to simulate operations without moving files
+            is_folder: Whether the operations move folders instead of files
         """
         if not operations:
             return
@@ -317,52 +672,78 @@ class DownloadOrganizer:
         # Batch create all destination directories
         unique_destinations = {dest_folder for _, dest_folder in operations}
         self._batch_create_directories(unique_destinations, dry_run)
+        self._prime_destination_cache(unique_destinations)
         
-        # Execute file moves with progress bar
-        for source, dest_folder in self._get_progress_iterator(operations, desc="Moving files"):
-            self._move_file(source, dest_folder, dry_run)
+        # Resolve every final name up front so conflict handling stays
+        # deterministic when the moves themselves run in parallel
+        planned = []
+        try:
+            for source, dest_folder in operations:
+                try:
+                    planned.append((source, dest_folder,
+                                    self._plan_destination(source, dest_folder)))
+                except OSError as e:
+                    self.logger.error("Error planning move for %s: %s", source.name, e)
+                    self._record_error()
+        finally:
+            self._clear_destination_cache()
+        
+        def move(op: Tuple[Path, Path, Path]) -> bool:
+            source, dest_folder, dest_path = op
+            return self._move_item(source, dest_folder, dry_run, is_folder, dest_path)
+        
+        # Moves are I/O bound and release the GIL, so overlap them in threads
+        workers = 1 if dry_run else self._workers
+        desc = "Moving folders" if is_folder else "Moving files"
+        if workers > 1 and len(planned) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(move, planned)
+                for _ in self._get_progress_iterator(results, desc=desc,
+                                                     total=len(planned)):
+                    pass
+        else:
+            for op in self._get_progress_iterator(planned, desc=desc):
+                move(op)
     
-    def organize_files(self, dry_run: bool = False) -> None:
-        """Organize files from the downloads folder using batch operations."""
+    def _get_source_dir(self) -> Optional[Path]:
+        """Return the expanded source directory, or None if it doesn't exist."""
         source_dir = self._expand_path(self.config['source_directory'])
         
         if not source_dir.exists():
-            self.logger.error(f"Source directory does not exist: {source_dir}")
-            return
-        
-        self.logger.info(f"Starting organization of: {source_dir}")
-        if dry_run:
-            self.logger.info("DRY RUN MODE - No files will be moved")
-        
-        # Collect all file operations
-        operations = self._collect_file_operations(source_dir)
-        
-        # Execute batched operations
-        self._execute_batch_operations(operations, dry_run)
+            self.logger.error("Source directory does not exist: %s", source_dir)
+            return None
+        return source_dir
+    
+    def organize_files(self, dry_run: bool = False) -> None:
+        """Organize files from the downloads folder using batch operations."""
+        self._organize(dry_run, include_files=True, include_folders=False)
     
     def organize_folders(self, dry_run: bool = False) -> None:
         """Organize folders from the downloads folder."""
-        source_dir = self._expand_path(self.config['source_directory'])
-        base_dest = self._expand_path(self.config['base_destination'])
+        self._organize(dry_run, include_files=False, include_folders=True)
+    
+    def _organize(self, dry_run: bool, include_files: bool, include_folders: bool) -> None:
+        """Organize files and/or folders from a single scan of the downloads folder."""
+        source_dir = self._get_source_dir()
+        if source_dir is None:
+            return
         
-        compressed_dest = base_dest / self._folder_config.get('compressed_destination', 'Compressed Folders')
-        regular_dest = base_dest / self._folder_config.get('regular_destination', 'Folders')
+        if include_files:
+            self.logger.info("Starting organization of: %s", source_dir)
+            if dry_run:
+                self.logger.info("DRY RUN MODE - No files will be moved")
         
-        self.logger.info("Processing folders...")
+        # Collect all operations
+        file_operations, folder_operations = self._collect_operations(
+            source_dir, include_files, include_folders
+        )
         
-        items = [item for item in source_dir.iterdir() if item.is_dir()]
+        # Execute batched operations
+        self._execute_batch_operations(file_operations, dry_run)
         
-        for item in self._get_progress_iterator(items, desc="Organizing folders"):
-            if self._should_skip_file(item):
-                self.logger.debug(f"Skipping folder: {item.name}")
-                self.stats.skipped += 1
-                continue
-            
-            # Determine if it's a compressed folder
-            if self._is_compressed_folder(item):
-                self._move_folder(item, compressed_dest, dry_run)
-            else:
-                self._move_folder(item, regular_dest, dry_run)
+        if include_folders:
+            self.logger.info("Processing folders...")
+            self._execute_batch_operations(folder_operations, dry_run, is_folder=True)
     
     def print_summary(self) -> None:
         """Print a summary of the organization operation."""
@@ -385,10 +766,7 @@ class DownloadOrganizer:
     def run(self, include_folders: bool = False, dry_run: bool = False) -> None:
         """Run the organization process."""
         try:
-            self.organize_files(dry_run)
-            
-            if include_folders:
-                self.organize_folders(dry_run)
+            self._organize(dry_run, include_files=True, include_folders=include_folders)
             
             self.logger.info("Organization completed!")
             self.print_summary()
@@ -397,7 +775,14 @@ class DownloadOrganizer:
             self.logger.warning("\nOperation cancelled by user")
             self.print_summary()
         except Exception as e:
-            self.logger.error(f"Fatal error: {e}", exc_info=True)
+            self.logger.error("Fatal error: %s", e, exc_info=True)
+        finally:
+            self._flush_logs()
+    
+    def _flush_logs(self) -> None:
+        """Write any buffered log records to their destinations."""
+        for handler in self.logger.handlers:
+            handler.flush()
 
 
 def main():
@@ -412,6 +797,7 @@ Examples:
   organizer.py --dry-run           # Preview what would be moved
   organizer.py -f --dry-run        # Preview files and folders
   organizer.py -c custom.yaml      # Use custom configuration file
+  organizer.py -c config.toml      # Use a TOML configuration file
         """
     )
     
@@ -430,7 +816,7 @@ Examples:
     parser.add_argument(
         '-c', '--config',
         default='config.yaml',
-        help='Path to configuration file (default: config.yaml)'
+        help='Path to YAML or TOML configuration file (default: config.yaml)'
     )
     
     parser.add_argument(
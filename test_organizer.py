@@ -5,15 +5,47 @@ Run with: python -m pytest test_organizer.py -v
 Or: python -m unittest test_organizer.py
 """
 
+import os
+import sys
+import errno
 import unittest
 import tempfile
+import time
 import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from organizer import DownloadOrganizer, OrganizationStats
+from unittest import mock
+from organizer import DownloadOrganizer, OrganizationStats, clear_config_cache
+import watch_downloads
+from watch_downloads import DownloadEventHandler
+
+# Set DLORG_TEST_NOCLEAN=1 to keep test directories for inspection
+NO_CLEAN = bool(os.environ.get('DLORG_TEST_NOCLEAN'))
+
+# All test directories live under one session directory that is removed
+# once at the end (on tmpfs via XDG_RUNTIME_DIR when available)
+_SESSION_TMP = None
+
+
+def setUpModule():
+    """Create the session directory for all tests in this module."""
+    global _SESSION_TMP
+    _SESSION_TMP = tempfile.mkdtemp(
+        prefix='dlorg_tests_', dir=os.environ.get('XDG_RUNTIME_DIR') or None
+    )
+
+
+def tearDownModule():
+    """Remove the session directory unless DLORG_TEST_NOCLEAN is set."""
+    if NO_CLEAN:
+        print(f"\nKeeping test files in: {_SESSION_TMP}")
+    else:
+        shutil.rmtree(_SESSION_TMP, ignore_errors=True)
 
 
 class TestOrganizationStats(unittest.TestCase):
-    """Test the OrganizationStats dataclass."""
+    """Test the OrganizationStats class."""
     
     def test_initialization(self):
         """Test that stats initialize with correct default values."""
@@ -32,29 +64,28 @@ class TestOrganizationStats(unittest.TestCase):
         stats.categories['images'] += 2
         self.assertEqual(stats.categories['pdf'], 1)
         self.assertEqual(stats.categories['images'], 2)
+    
+    def test_keyword_construction_and_equality(self):
+        """Test that fields can be passed by keyword and compare by value."""
+        stats = OrganizationStats(files_moved=2, errors=1)
+        self.assertEqual(stats.files_moved, 2)
+        self.assertEqual(stats.errors, 1)
+        self.assertEqual(stats.skipped, 0)
+        
+        other = OrganizationStats()
+        other.files_moved += 2
+        other.errors += 1
+        self.assertEqual(stats, other)
+        other.categories['pdf'] += 1
+        self.assertNotEqual(stats, other)
 
 
 class TestDownloadOrganizer(unittest.TestCase):
     """Test the DownloadOrganizer class."""
     
-    def setUp(self):
-        """Set up test fixtures."""
-        # Create a temporary directory for test files
-        self.test_dir = tempfile.mkdtemp()
-        self.test_downloads = Path(self.test_dir) / "downloads"
-        self.test_storage = Path(self.test_dir) / "storage"
-        self.test_downloads.mkdir()
-        self.test_storage.mkdir()
-        
-        # Create a minimal test config
-        self.config_path = Path(self.test_dir) / "test_config.yaml"
-        # Use forward slashes or raw strings for YAML paths
-        downloads_str = str(self.test_downloads).replace('\\', '/')
-        storage_str = str(self.test_storage).replace('\\', '/')
-        
-        config_content = f"""
-source_directory: "{downloads_str}"
-base_destination: "{storage_str}"
+    _CONFIG_TMPL = """
+source_directory: "{downloads}"
+base_destination: "{storage}"
 
 file_types:
   pdf:
@@ -82,11 +113,40 @@ settings:
   handle_conflicts: true
   skip_hidden_files: true
 """
-        self.config_path.write_text(config_content)
+    
+    @classmethod
+    def setUpClass(cls):
+        """Start a background pool for removing test directories."""
+        cls._cleanup_pool = ThreadPoolExecutor(max_workers=2)
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Wait for pending test directory removals."""
+        cls._cleanup_pool.shutdown(wait=True)
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        # Create a temporary directory for test files
+        self.test_dir = tempfile.mkdtemp(dir=_SESSION_TMP)
+        self.test_downloads = Path(self.test_dir) / "downloads"
+        self.test_storage = Path(self.test_dir) / "storage"
+        self.test_downloads.mkdir()
+        self.test_storage.mkdir()
+        
+        # Create a minimal test config
+        self.config_path = Path(self.test_dir) / "test_config.yaml"
+        # Use forward slashes or raw strings for YAML paths
+        downloads_str = str(self.test_downloads).replace('\\', '/')
+        storage_str = str(self.test_storage).replace('\\', '/')
+        
+        self.config_path.write_text(
+            self._CONFIG_TMPL.format(downloads=downloads_str, storage=storage_str)
+        )
     
     def tearDown(self):
-        """Clean up test fixtures."""
-        shutil.rmtree(self.test_dir)
+        """Clean up test fixtures in the background."""
+        if not NO_CLEAN:
+            self._cleanup_pool.submit(shutil.rmtree, self.test_dir, True)
     
     def test_organizer_initialization(self):
         """Test that organizer initializes correctly."""
@@ -99,6 +159,40 @@ settings:
         with self.assertRaises(FileNotFoundError):
             DownloadOrganizer("nonexistent_config.yaml")
     
+    def test_config_loading_toml(self):
+        """Test that a TOML config is loaded when the file ends in .toml."""
+        toml_path = Path(self.test_dir) / "test_config.toml"
+        toml_path.write_text(f"""
+source_directory = "{self.test_downloads.as_posix()}"
+base_destination = "{self.test_storage.as_posix()}"
+
+[file_types.pdf]
+extensions = [".PDF"]
+destination = "PDF"
+
+[logging]
+log_to_console = false
+log_to_file = false
+""")
+        organizer = DownloadOrganizer(str(toml_path))
+        dest = organizer._get_destination_for_file(Path("/tmp/test.pdf"))
+        self.assertTrue(str(dest).endswith("PDF"))
+    
+    def test_config_cache_returns_independent_copies(self):
+        """Test that cached configs are copied and reloaded when the file changes."""
+        self.addCleanup(clear_config_cache)
+        first = DownloadOrganizer(str(self.config_path))
+        first.config['file_types']['pdf']['destination'] = "Changed"
+        
+        second = DownloadOrganizer(str(self.config_path))
+        self.assertEqual(second.config['file_types']['pdf']['destination'], "PDF")
+        
+        self.config_path.write_text(
+            self.config_path.read_text().replace('"PDF"', '"Papers"')
+        )
+        third = DownloadOrganizer(str(self.config_path))
+        self.assertEqual(third.config['file_types']['pdf']['destination'], "Papers")
+    
     def test_expand_path(self):
         """Test path expansion works correctly."""
         organizer = DownloadOrganizer(str(self.config_path))
@@ -139,6 +233,42 @@ settings:
         self.assertEqual(resolved.name, "test_1.txt")
         self.assertEqual(organizer.stats.conflicts_resolved, 1)
     
+    def test_resolve_conflict_reserves_names_in_batch(self):
+        """Test that names resolved during a batch are reserved for later items."""
+        organizer = DownloadOrganizer(str(self.config_path))
+        organizer._prime_destination_cache({self.test_storage})
+        
+        target = self.test_storage / "report.pdf"
+        self.assertEqual(organizer._resolve_conflict(target).name, "report.pdf")
+        self.assertEqual(organizer._resolve_conflict(target).name, "report_1.pdf")
+        self.assertEqual(organizer._resolve_conflict(target).name, "report_2.pdf")
+        self.assertEqual(organizer.stats.conflicts_resolved, 2)
+    
+    @unittest.skipIf(sys.platform in ('win32', 'cygwin', 'darwin'),
+                     "default filesystem is case-insensitive")
+    def test_resolve_conflict_case_sensitive(self):
+        """Test case-only name matches on a case-sensitive filesystem."""
+        (self.test_storage / "Report.pdf").write_text("existing")
+        target = self.test_storage / "report.pdf"
+        
+        organizer = DownloadOrganizer(str(self.config_path))
+        self.assertEqual(organizer._resolve_conflict(target), target)
+        
+        organizer._prime_destination_cache({self.test_storage})
+        self.assertEqual(organizer._resolve_conflict(target), target)
+        self.assertEqual(organizer.stats.conflicts_resolved, 0)
+        
+        # A case-only match is confirmed with exists(), which reports a
+        # conflict on case-insensitive mounts (e.g. FAT/exFAT drives)
+        organizer = DownloadOrganizer(str(self.config_path))
+        organizer._prime_destination_cache({self.test_storage})
+        with mock.patch.object(Path, "exists", autospec=True, return_value=True) as exists:
+            resolved = organizer._resolve_conflict(target)
+        
+        self.assertEqual(resolved.name, "report_1.pdf")
+        exists.assert_called_once_with(target)
+        self.assertEqual(organizer.stats.conflicts_resolved, 1)
+    
     def test_should_skip_hidden_file(self):
         """Test that hidden files are skipped when configured."""
         organizer = DownloadOrganizer(str(self.config_path))
@@ -167,6 +297,18 @@ settings:
         # Stats should be updated
         self.assertEqual(organizer.stats.files_moved, 2)
     
+    def test_organize_files_skips_hidden(self):
+        """Test that hidden files are counted as skipped and left in place."""
+        (self.test_downloads / ".secret.pdf").write_text("hidden")
+        (self.test_downloads / "visible.pdf").write_text("visible")
+        
+        organizer = DownloadOrganizer(str(self.config_path))
+        organizer.organize_files(dry_run=False)
+        
+        self.assertTrue((self.test_downloads / ".secret.pdf").exists())
+        self.assertEqual(organizer.stats.skipped, 1)
+        self.assertEqual(organizer.stats.files_moved, 1)
+    
     def test_organize_files_actual_move(self):
         """Test organizing files with actual moving."""
         # Create test files
@@ -205,6 +347,48 @@ settings:
         self.assertTrue((pdf_dest / "report_1.pdf").exists())
         self.assertEqual(organizer.stats.conflicts_resolved, 1)
     
+    def test_organize_folders_leaves_files(self):
+        """Test that folder organization only moves folders."""
+        (self.test_downloads / "project").mkdir()
+        (self.test_downloads / "notes.pdf").write_text("pdf content")
+        
+        organizer = DownloadOrganizer(str(self.config_path))
+        organizer.organize_folders(dry_run=False)
+        
+        self.assertTrue((self.test_storage / "Folders" / "project").is_dir())
+        self.assertTrue((self.test_downloads / "notes.pdf").exists())
+        self.assertEqual(organizer.stats.folders_moved, 1)
+        self.assertEqual(organizer.stats.files_moved, 0)
+    
+    def test_move_file_recreates_deleted_folder(self):
+        """Test that a destination folder removed after first use is re-created."""
+        organizer = DownloadOrganizer(str(self.config_path))
+        first = self.test_downloads / "first.pdf"
+        first.write_text("pdf content")
+        self.assertTrue(organizer._move_file(first, organizer._get_destination_for_file(first)))
+        
+        shutil.rmtree(self.test_storage / "PDF")
+        second = self.test_downloads / "second.pdf"
+        second.write_text("pdf content")
+        self.assertTrue(organizer._move_file(second, organizer._get_destination_for_file(second)))
+        
+        self.assertFalse(second.exists())
+        self.assertTrue((self.test_storage / "PDF" / "second.pdf").exists())
+        self.assertEqual(organizer.stats.errors, 0)
+    
+    def test_organize_files_cross_device_fallback(self):
+        """Test that moves fall back to copying when rename crosses devices."""
+        (self.test_downloads / "document.pdf").write_text("pdf content")
+        
+        organizer = DownloadOrganizer(str(self.config_path))
+        cross_device = OSError(errno.EXDEV, "Invalid cross-device link")
+        with mock.patch("organizer.os.rename", side_effect=cross_device):
+            organizer.organize_files(dry_run=False)
+        
+        self.assertFalse((self.test_downloads / "document.pdf").exists())
+        self.assertTrue((self.test_storage / "PDF" / "document.pdf").exists())
+        self.assertEqual(organizer.stats.errors, 0)
+    
     def test_is_compressed_folder(self):
         """Test compressed folder detection."""
         organizer = DownloadOrganizer(str(self.config_path))
@@ -220,20 +404,70 @@ settings:
         result = organizer._is_compressed_folder(test_folder)
         # Just verify method runs without error
         self.assertIsInstance(result, bool)
+    
+    def _write_archive_config(self, filename, deep_scan):
+        """Write a config with a compressed category and the given deep_scan."""
+        config = self.config_path.read_text().replace(
+            '  images:',
+            '  archives:\n    extensions: [".zip"]\n    destination: "Compressed"\n  images:',
+        ).replace('folders:\n', f'folders:\n  deep_scan: {str(deep_scan).lower()}\n')
+        path = Path(self.test_dir) / filename
+        path.write_text(config)
+        return path
+    
+    def test_is_compressed_folder_deep_scan(self):
+        """Test that nested archives are only found when deep_scan is enabled."""
+        shallow_path = self._write_archive_config("shallow_config.yaml", False)
+        deep_path = self._write_archive_config("deep_config.yaml", True)
+        
+        test_folder = self.test_downloads / "project"
+        (test_folder / "nested").mkdir(parents=True)
+        (test_folder / "nested" / "data.zip").write_text("compressed")
+        
+        shallow = DownloadOrganizer(str(shallow_path))
+        self.assertFalse(shallow._is_compressed_folder(test_folder))
+        
+        deep = DownloadOrganizer(str(deep_path))
+        self.assertTrue(deep._is_compressed_folder(test_folder))
+        deep.organize_folders(dry_run=False)
+        self.assertTrue((self.test_storage / "Compressed Folders" / "project").is_dir())
+    
+    def test_deep_scan_skips_unreadable_subfolder(self):
+        """Test that an unreadable subfolder doesn't stop the deep scan."""
+        organizer = DownloadOrganizer(str(self._write_archive_config("deep_config.yaml", True)))
+        
+        test_folder = self.test_downloads / "project"
+        locked = test_folder / "locked"
+        locked.mkdir(parents=True)
+        # Breadth-first, so locked/ is listed before nested/inner/
+        (test_folder / "nested" / "inner").mkdir(parents=True)
+        (test_folder / "nested" / "inner" / "data.zip").write_text("compressed")
+        
+        real_scandir = os.scandir
+        
+        def scandir(path):
+            if Path(path) == locked:
+                raise PermissionError(errno.EACCES, "Permission denied", str(path))
+            return real_scandir(path)
+        
+        with mock.patch("organizer.os.scandir", side_effect=scandir):
+            self.assertTrue(organizer._is_compressed_folder(test_folder))
 
 
 class TestFileOperations(unittest.TestCase):
     """Test file operation edge cases."""
     
-    def setUp(self):
-        """Set up test environment."""
-        self.test_dir = tempfile.mkdtemp()
-        self.config_path = Path(self.test_dir) / "test_config.yaml"
+    @classmethod
+    def setUpClass(cls):
+        """Write the shared config once and start the cleanup pool."""
+        cls._cleanup_pool = ThreadPoolExecutor(max_workers=2)
+        cls.class_dir = tempfile.mkdtemp(dir=_SESSION_TMP)
+        cls.config_path = Path(cls.class_dir) / "test_config.yaml"
         # Use forward slashes for YAML paths
-        test_dir_str = str(self.test_dir).replace('\\', '/')
+        class_dir_str = str(cls.class_dir).replace('\\', '/')
         config_content = f"""
-source_directory: "{test_dir_str}/downloads"
-base_destination: "{test_dir_str}/storage"
+source_directory: "{class_dir_str}/downloads"
+base_destination: "{class_dir_str}/storage"
 file_types:
   pdf:
     extensions: [".pdf"]
@@ -248,11 +482,23 @@ settings:
   handle_conflicts: true
   skip_hidden_files: true
 """
-        self.config_path.write_text(config_content)
+        cls.config_path.write_text(config_content)
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Wait for pending removals, then remove the shared directory."""
+        cls._cleanup_pool.shutdown(wait=True)
+        if not NO_CLEAN:
+            shutil.rmtree(cls.class_dir, ignore_errors=True)
+    
+    def setUp(self):
+        """Create a fresh working directory for the test's files."""
+        self.test_dir = tempfile.mkdtemp(dir=self.class_dir)
     
     def tearDown(self):
-        """Clean up."""
-        shutil.rmtree(self.test_dir)
+        """Clean up in the background."""
+        if not NO_CLEAN:
+            self._cleanup_pool.submit(shutil.rmtree, self.test_dir, True)
     
     def test_multiple_conflict_resolution(self):
         """Test resolving multiple conflicts."""
@@ -273,5 +519,94 @@ settings:
         self.assertEqual(resolved2.name, "test_2.txt")
 
 
+class TestDownloadEventHandler(unittest.TestCase):
+    """Test the watcher's event handling without a running observer."""
+    
+    def setUp(self):
+        """Create a handler whose _process only records calls."""
+        self.handler = DownloadEventHandler(mock.Mock())
+        self.handler.QUIET_PERIOD = 0.05
+        self.processed = threading.Event()
+        self.handler._process = mock.Mock(side_effect=lambda *args: self.processed.set())
+        self.addCleanup(self.handler.cancel_pending)
+        self.file_path = Path("/downloads/report.pdf")
+    
+    def _event(self, path, is_directory=False):
+        """Build a minimal watchdog-style event."""
+        return mock.Mock(src_path=str(path), is_directory=is_directory)
+    
+    @mock.patch.object(watch_downloads, 'HAS_CLOSE_EVENTS', True)
+    def test_created_file_without_close_event(self):
+        """Test that a file moved in from elsewhere is organized on Linux."""
+        self.handler.on_created(self._event(self.file_path))
+        
+        self.assertTrue(self.processed.wait(1))
+        self.handler._process.assert_called_once_with(self.file_path, "File completed")
+    
+    @mock.patch.object(watch_downloads, 'HAS_CLOSE_EVENTS', True)
+    def test_close_event_cancels_pending_timer(self):
+        """Test that a file written in place is organized once, on close."""
+        self.handler.on_created(self._event(self.file_path))
+        self.handler.on_closed(self._event(self.file_path))
+        time.sleep(self.handler.QUIET_PERIOD * 3)
+        
+        self.handler._process.assert_called_once_with(self.file_path, "File written")
+    
+    @mock.patch.object(watch_downloads, 'HAS_CLOSE_EVENTS', True)
+    def test_write_stall_waits_for_close_event(self):
+        """Test that a file being written isn't organized during a pause."""
+        event = self._event(self.file_path)
+        self.handler.on_created(event)
+        self.handler.on_modified(event)
+        time.sleep(self.handler.QUIET_PERIOD * 3)
+        self.handler._process.assert_not_called()
+        
+        self.handler.on_closed(event)
+        self.handler._process.assert_called_once_with(self.file_path, "File written")
+    
+    @mock.patch.object(watch_downloads, 'HAS_CLOSE_EVENTS', False)
+    def test_debounce_rearms_on_new_events(self):
+        """Test that events within the quiet period push the timer back."""
+        event = self._event(self.file_path)
+        self.handler.on_created(event)
+        for _ in range(4):
+            time.sleep(self.handler.QUIET_PERIOD / 2)
+            self.handler.on_modified(event)
+            self.handler._process.assert_not_called()
+        
+        self.assertTrue(self.processed.wait(1))
+    
+    @mock.patch.object(watch_downloads, 'HAS_CLOSE_EVENTS', False)
+    def test_debounce_fires_once_per_burst(self):
+        """Test that a burst of events organizes the file once."""
+        event = self._event(self.file_path)
+        self.handler.on_created(event)
+        for _ in range(5):
+            self.handler.on_modified(event)
+        
+        self.assertTrue(self.processed.wait(1))
+        time.sleep(self.handler.QUIET_PERIOD * 3)
+        self.handler._process.assert_called_once_with(self.file_path, "File completed")
+        self.assertEqual(self.handler._timers, {})
+        self.assertEqual(self.handler._last_event, {})
+    
+    def test_cancel_pending(self):
+        """Test that cancelled timers don't organize their file."""
+        self.handler._debounce(self.file_path)
+        self.handler.cancel_pending()
+        time.sleep(self.handler.QUIET_PERIOD * 3)
+        
+        self.handler._process.assert_not_called()
+    
+    def test_timer_fired_after_cancel(self):
+        """Test that a timer callback running after cancel_pending exits quietly."""
+        self.handler._debounce(self.file_path)
+        self.handler.cancel_pending()
+        
+        # What a timer that already fired does once it gets the lock
+        self.handler._on_quiet(self.file_path)
+        self.handler._process.assert_not_called()
+
+
 if __name__ == "__main__":
     unittest.main()
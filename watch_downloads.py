@@ -15,15 +15,14 @@ import sys
 import time
 import logging
 import argparse
+import functools
+import threading
 from pathlib import Path
+from typing import Dict
 
-try:
-    from watchdog.observers import Observer
-    from watchdog.events import FileSystemEventHandler
-except ImportError:
-    print("Error: watchdog library is required for real-time monitoring.")
-    print("Install it with: pip install watchdog")
-    sys.exit(1)
+# inotify reports IN_CLOSE_WRITE, which watchdog delivers as on_closed;
+# other platforms have no close events and wait for a quiet period instead
+HAS_CLOSE_EVENTS = sys.platform.startswith('linux')
 
 try:
     from organizer import DownloadOrganizer
@@ -33,17 +32,58 @@ except ImportError:
     sys.exit(1)
 
 
-class DownloadEventHandler(FileSystemEventHandler):
-    """Handle file system events in the downloads folder."""
+def _load_watchdog():
+    """Import watchdog on first use so --help and argument errors stay fast."""
+    try:
+        from watchdog.observers import Observer
+        from watchdog.events import FileSystemEventHandler
+    except ImportError:
+        print("Error: watchdog library is required for real-time monitoring.")
+        print("Install it with: pip install watchdog")
+        sys.exit(1)
+    return Observer, FileSystemEventHandler
+
+
+@functools.lru_cache(maxsize=None)
+def _event_handler_class():
+    """Return DownloadEventHandler combined with watchdog's FileSystemEventHandler."""
+    _, FileSystemEventHandler = _load_watchdog()
+    return type('DownloadEventHandler', (DownloadEventHandler, FileSystemEventHandler), {})
+
+
+class DownloadEventHandler:
+    """Handle file system events in the downloads folder.
+    
+    watchdog is imported lazily, so the FileSystemEventHandler base (which
+    provides dispatch()) is mixed in by _event_handler_class() at start-up.
+    """
+    
+    # Temporary/partial downloads: names starting with ~ or . and browser
+    # in-progress extensions
+    _TEMP_PREFIXES = ('~', '.')
+    _TEMP_SUFFIXES = ('.crdownload', '.tmp', '.part', '.download')
+    
+    # Without close events, a file counts as complete after this long
+    # without create/modify events
+    QUIET_PERIOD = 0.75
     
     def __init__(self, organizer: DownloadOrganizer):
         """Initialize the event handler with an organizer instance."""
         self.organizer = organizer
         self.logger = logging.getLogger(__name__)
-        self.processing = set()  # Track files currently being processed
+        # Files currently being processed; the lock makes claiming a path atomic
+        self._inflight_lock = threading.Lock()
+        self._inflight: Dict[Path, None] = {}
+        # Timers fire on their own threads, but the organizer's single-file
+        # path (stats, conflict checks) is not thread-safe
+        self._organize_lock = threading.Lock()
+        # Quiet-period timers for files without a close event
+        self._timers_lock = threading.Lock()
+        self._last_event: Dict[Path, float] = {}
+        self._timers: Dict[Path, threading.Timer] = {}
     
-    def on_created(self, event):
-        """Handle new file creation events."""
+    def on_closed(self, event):
+        """Handle a file being closed after writing (Linux/inotify only)."""
         if event.is_directory:
             return
         
@@ -53,20 +93,38 @@ class DownloadEventHandler(FileSystemEventHandler):
         if self._is_temporary_file(file_path):
             return
         
-        # Wait a bit to ensure file is fully written
-        time.sleep(1)
+        self._cancel_timer(file_path)
+        self._process(file_path, "File written")
+    
+    def on_moved(self, event):
+        """Handle a download being renamed to its final name."""
+        if event.is_directory:
+            return
         
-        # Avoid processing the same file multiple times
-        if file_path in self.processing:
+        # Browsers write to a temporary name and rename it when done
+        file_path = Path(event.dest_path)
+        if file_path.parent != Path(event.src_path).parent:
+            return
+        if self._is_temporary_file(file_path):
             return
         
-        self.processing.add(file_path)
+        self._process(file_path, "Download completed")
+    
+    def on_created(self, event):
+        """Handle new file creation events."""
+        # Also covers files moved in from another folder, which get no close
+        # or modify events; on Linux, files written in place cancel this timer
+        # on their first write and are handled on close instead
+        if event.is_directory:
+            return
         
-        try:
-            self.logger.info(f"New file detected: {file_path.name}")
-            self._organize_file(file_path)
-        finally:
-            self.processing.discard(file_path)
+        file_path = Path(event.src_path)
+        
+        # Skip temporary or partial download files
+        if self._is_temporary_file(file_path):
+            return
+        
+        self._debounce(file_path)
     
     def on_modified(self, event):
         """Handle file modification events."""
@@ -76,58 +134,96 @@ class DownloadEventHandler(FileSystemEventHandler):
         # For download completion detection
         file_path = Path(event.src_path)
         
-        # Only process if file is no longer temporary and fully downloaded
+        # Only process if file is no longer temporary
         if self._is_temporary_file(file_path):
             return
         
-        if not file_path.exists():
+        # A writer is active and its close event will follow; a quiet-period
+        # timer could fire during a network stall and move a partial file
+        if HAS_CLOSE_EVENTS:
+            self._cancel_timer(file_path)
             return
         
-        # Check if file size is stable (not being written)
-        if self._is_file_stable(file_path):
-            if file_path not in self.processing:
-                self.processing.add(file_path)
-                try:
-                    self.logger.debug(f"File completed: {file_path.name}")
-                    self._organize_file(file_path)
-                finally:
-                    self.processing.discard(file_path)
+        self._debounce(file_path)
     
-    def _is_temporary_file(self, file_path: Path) -> bool:
-        """Check if file is a temporary download file."""
-        temp_extensions = {'.crdownload', '.tmp', '.part', '.download'}
-        temp_prefixes = {'~', '.'}
-        
-        # Check extension
-        if file_path.suffix.lower() in temp_extensions:
-            return True
-        
-        # Check if filename starts with temp prefix
-        if any(file_path.name.startswith(prefix) for prefix in temp_prefixes):
-            return True
+    def _debounce(self, file_path: Path):
+        """Organize a file once no events arrived for QUIET_PERIOD seconds."""
+        with self._timers_lock:
+            self._last_event[file_path] = time.monotonic()
+            # A pending timer re-checks the latest timestamp when it fires
+            if file_path not in self._timers:
+                self._start_timer(file_path, self.QUIET_PERIOD)
+    
+    def _start_timer(self, file_path: Path, delay: float):
+        """Start the quiet-period timer for a file (caller holds _timers_lock)."""
+        timer = threading.Timer(delay, self._on_quiet, args=(file_path,))
+        timer.daemon = True
+        self._timers[file_path] = timer
+        timer.start()
+    
+    def _on_quiet(self, file_path: Path):
+        """Timer callback: organize the file or wait out newer events."""
+        with self._timers_lock:
+            # Cancelled or replaced while this timer waited for the lock
+            last_event = self._last_event.get(file_path)
+            if last_event is None or self._timers.get(file_path) is not threading.current_thread():
+                return
+            remaining = last_event + self.QUIET_PERIOD - time.monotonic()
+            if remaining > 0:
+                self._start_timer(file_path, remaining)
+                return
+            del self._last_event[file_path]
+            del self._timers[file_path]
         
-        return False
+        self._process(file_path, "File completed")
     
-    def _is_file_stable(self, file_path: Path, wait_time: float = 0.5) -> bool:
-        """Check if file size is stable (not being written)."""
+    def _cancel_timer(self, file_path: Path):
+        """Cancel the quiet-period timer for a file, if one is pending."""
+        with self._timers_lock:
+            timer = self._timers.pop(file_path, None)
+            self._last_event.pop(file_path, None)
+        if timer is not None:
+            timer.cancel()
+    
+    def cancel_pending(self):
+        """Cancel timers for files still waiting for their quiet period."""
+        with self._timers_lock:
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
+            self._last_event.clear()
+    
+    def _process(self, file_path: Path, reason: str):
+        """Organize a file unless it is already being processed."""
+        # Avoid processing the same file multiple times
+        with self._inflight_lock:
+            if file_path in self._inflight:
+                return
+            self._inflight[file_path] = None
+        
         try:
-            size1 = file_path.stat().st_size
-            time.sleep(wait_time)
-            size2 = file_path.stat().st_size
-            return size1 == size2 and size1 > 0
-        except (OSError, FileNotFoundError):
-            return False
+            self.logger.info("%s: %s", reason, file_path.name)
+            with self._organize_lock:
+                self._organize_file(file_path)
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(file_path, None)
+    
+    def _is_temporary_file(self, file_path: Path) -> bool:
+        """Check if file is a temporary download file."""
+        name = file_path.name
+        return name.startswith(self._TEMP_PREFIXES) or name.lower().endswith(self._TEMP_SUFFIXES)
     
     def _organize_file(self, file_path: Path):
         """Organize a single file."""
         if not file_path.exists():
-            self.logger.warning(f"File no longer exists: {file_path.name}")
+            self.logger.warning("File no longer exists: %s", file_path.name)
             return
         
         try:
             # Check if should skip
             if self.organizer._should_skip_file(file_path):
-                self.logger.debug(f"Skipping: {file_path.name}")
+                self.logger.debug("Skipping: %s", file_path.name)
                 return
             
             # Get destination
@@ -135,12 +231,13 @@ class DownloadEventHandler(FileSystemEventHandler):
             if dest_folder:
                 success = self.organizer._move_file(file_path, dest_folder, dry_run=False)
                 if success:
-                    self.logger.info(f"✓ Organized: {file_path.name}")
+                    self.logger.info("✓ Organized: %s", file_path.name)
                 else:
-                    self.logger.warning(f"✗ Failed to organize: {file_path.name}")
+                    self.logger.warning("✗ Failed to organize: %s", file_path.name)
+                self.organizer._flush_logs()
         
         except Exception as e:
-            self.logger.error(f"Error organizing {file_path.name}: {e}")
+            self.logger.error("Error organizing %s: %s", file_path.name, e)
 
 
 class DownloadWatcher:
@@ -151,6 +248,7 @@ class DownloadWatcher:
         self.organizer = DownloadOrganizer(config_path)
         self.logger = logging.getLogger(__name__)
         self.observer = None
+        self.event_handler = None
     
     def start(self):
         """Start monitoring the downloads folder."""
@@ -159,13 +257,14 @@ class DownloadWatcher:
         )
         
         if not source_dir.exists():
-            self.logger.error(f"Source directory does not exist: {source_dir}")
+            self.logger.error("Source directory does not exist: %s", source_dir)
             return
         
         # Create event handler and observer
-        event_handler = DownloadEventHandler(self.organizer)
+        Observer, _ = _load_watchdog()
+        self.event_handler = _event_handler_class()(self.organizer)
         self.observer = Observer()
-        self.observer.schedule(event_handler, str(source_dir), recursive=False)
+        self.observer.schedule(self.event_handler, str(source_dir), recursive=False)
         
         # Start monitoring
         self.observer.start()
@@ -189,6 +288,7 @@ class DownloadWatcher:
         if self.observer:
             self.observer.stop()
             self.observer.join()
+            self.event_handler.cancel_pending()
             print("\n" + "=" * 60)
             print("📁 DOWNLOAD WATCHER STOPPED")
             print("=" * 60)